@@ -3,11 +3,31 @@ LLM Service using Ollama for question generation and assessment
 """
 import json
 import re
+import time
 from typing import List, Dict, Optional
+import httpx
 import ollama
 from models import ConversationEntry
 
 
+# Retry and circuit breaker settings for Ollama calls
+OLLAMA_MAX_RETRIES = 3
+OLLAMA_BACKOFF_BASE = 0.5  # seconds, doubled after every failed attempt
+OLLAMA_RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+OLLAMA_BREAKER_THRESHOLD = 5  # consecutive failures before the breaker opens
+OLLAMA_BREAKER_COOLDOWN = 30.0  # seconds to fail fast once the breaker is open
+
+# Patterns for parsing LLM responses, compiled once at import
+LEVEL_RE = re.compile(r'LEVEL:\s*(\w+)', re.IGNORECASE)
+SCORE_RE = re.compile(r'SCORE:\s*(\d+)', re.IGNORECASE)
+COMPETENCY_RE = re.compile(r'COMPETENCY:\s*(\w+)', re.IGNORECASE)
+REPORT_SECTION_RE = {
+    name: re.compile(f"{name}:(.*?)(?:WEAKNESSES:|RECOMMENDATIONS:|$)", re.IGNORECASE | re.DOTALL)
+    for name in ("STRENGTHS", "WEAKNESSES", "RECOMMENDATIONS")
+}
+LIST_ITEM_RE = re.compile(r'-\s*(.+)')
+
+
 class LLMService:
     """Service for interacting with Ollama LLM for viva assessment"""
     
@@ -20,12 +40,19 @@ class LLMService:
         """
         self.model_name = model_name
         self.client = ollama.Client()
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
         print(f"✓ LLM Service initialized with model: {model_name}")
     
     def _call_ollama(self, prompt: str, temperature: float = 0.7) -> str:
         """
         Make a call to Ollama and return the response
         
+        Transient failures (connection errors, 429/5xx) are retried with
+        exponential backoff. After OLLAMA_BREAKER_THRESHOLD consecutive
+        failures the circuit breaker opens and calls fail fast until the
+        cooldown expires, so an overloaded server is not hammered further.
+        
         Args:
             prompt: The prompt to send
             temperature: Sampling temperature (0.0-1.0)
@@ -33,19 +60,42 @@ class LLMService:
         Returns:
             Generated text response
         """
-        try:
-            response = self.client.generate(
-                model=self.model_name,
-                prompt=prompt,
-                options={
-                    "temperature": temperature,
-                    "num_predict": 500,  # Increased for better responses
-                }
-            )
-            return response['response'].strip()
-        except Exception as e:
-            print(f"Error calling Ollama: {e}")
-            raise
+        if time.monotonic() < self._breaker_open_until:
+            raise RuntimeError("Ollama circuit breaker is open, try again shortly")
+        
+        for attempt in range(OLLAMA_MAX_RETRIES + 1):
+            try:
+                response = self.client.generate(
+                    model=self.model_name,
+                    prompt=prompt,
+                    options={
+                        "temperature": temperature,
+                        "num_predict": 500,  # Increased for better responses
+                    }
+                )
+                self._consecutive_failures = 0
+                return response['response'].strip()
+            except Exception as e:
+                print(f"Error calling Ollama (attempt {attempt + 1}): {e}")
+                if not self._is_retryable(e):
+                    raise
+                
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= OLLAMA_BREAKER_THRESHOLD:
+                    self._breaker_open_until = time.monotonic() + OLLAMA_BREAKER_COOLDOWN
+                    print(f"Ollama circuit breaker opened for {OLLAMA_BREAKER_COOLDOWN:.0f}s")
+                    raise
+                if attempt == OLLAMA_MAX_RETRIES:
+                    raise
+                
+                time.sleep(OLLAMA_BACKOFF_BASE * (2 ** attempt))
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether an Ollama error is transient and worth retrying"""
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code in OLLAMA_RETRYABLE_STATUS
+        return isinstance(error, (ConnectionError, httpx.TransportError))
     
     def generate_first_question(
         self,
@@ -123,13 +173,6 @@ Return ONLY the question text in simple English, nothing else."""
         last_question = last_entry.question_text if last_entry else ""
         last_score = last_entry.score if last_entry else 0
         
-        # Build conversation context
-        history_text = ""
-        for entry in conversation_history:
-            history_text += f"\nQ{entry.question_number}: {entry.question_text}\n"
-            history_text += f"A{entry.question_number}: {entry.answer_text}\n"
-            history_text += f"Assessment: {entry.understanding_level} (Score: {entry.score}/100)\n"
-        
         prompt = f"""You are a friendly programming teacher giving feedback and asking the next question.
 
 Last Question: {last_question}
@@ -232,8 +275,8 @@ SCORE: [number]"""
         response = self._call_ollama(prompt, temperature=0.2)  # Lower temperature for consistent scoring
         
         # Parse the response
-        level_match = re.search(r'LEVEL:\s*(\w+)', response, re.IGNORECASE)
-        score_match = re.search(r'SCORE:\s*(\d+)', response, re.IGNORECASE)
+        level_match = LEVEL_RE.search(response)
+        score_match = SCORE_RE.search(response)
         
         understanding_level = level_match.group(1).lower() if level_match else "none"
         score = int(score_match.group(1)) if score_match else 0
@@ -291,11 +334,12 @@ SCORE: [number]"""
         avg_score = total_score // len(conversation_history) if conversation_history else 0
         
         # Build conversation summary
-        history_text = ""
-        for entry in conversation_history:
-            history_text += f"\nQ{entry.question_number}: {entry.question_text}\n"
-            history_text += f"A{entry.question_number}: {entry.answer_text}\n"
-            history_text += f"Score: {entry.score}/100 ({entry.understanding_level})\n"
+        history_text = "".join(
+            f"\nQ{entry.question_number}: {entry.question_text}\n"
+            f"A{entry.question_number}: {entry.answer_text}\n"
+            f"Score: {entry.score}/100 ({entry.understanding_level})\n"
+            for entry in conversation_history
+        )
         
         prompt = f"""You are completing a viva voce assessment report for a student.
 
@@ -330,7 +374,7 @@ RECOMMENDATIONS:
         response = self._call_ollama(prompt, temperature=0.3)
         
         # Parse the response
-        competency_match = re.search(r'COMPETENCY:\s*(\w+)', response, re.IGNORECASE)
+        competency_match = COMPETENCY_RE.search(response)
         competency = competency_match.group(1).upper() if competency_match else "BEGINNER"
         
         # Validate and override competency based on actual score
@@ -350,11 +394,10 @@ RECOMMENDATIONS:
         
         # Extract lists
         def extract_list(section_name: str, text: str) -> List[str]:
-            pattern = f"{section_name}:(.*?)(?:WEAKNESSES:|RECOMMENDATIONS:|$)"
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            match = REPORT_SECTION_RE[section_name].search(text)
             if match:
                 section = match.group(1)
-                items = re.findall(r'-\s*(.+)', section)
+                items = LIST_ITEM_RE.findall(section)
                 return [item.strip() for item in items if item.strip()]
             return []
         
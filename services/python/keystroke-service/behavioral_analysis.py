@@ -9,7 +9,6 @@ from datetime import datetime
 import numpy as np
 from collections import defaultdict
 import statistics
-import google.generativeai as genai
 import os
 import json
 
@@ -102,6 +101,8 @@ class BehavioralAnalyzer:
     def __init__(self, gemini_api_key: Optional[str] = None):
         self.gemini_api_key = gemini_api_key or os.getenv('GEMINI_API_KEY')
         if self.gemini_api_key:
+            # Imported here so the Gemini SDK is only loaded when LLM analysis is enabled
+            import google.generativeai as genai
             genai.configure(api_key=self.gemini_api_key)
             self.model = genai.GenerativeModel('gemini-2.5-flash')
         else:
@@ -172,36 +173,58 @@ class BehavioralAnalyzer:
         total_duration = (events[-1].timestamp - events[0].timestamp) / 1000  # seconds
         total_keystrokes = len(events)
         
-        # Typing speed (CPM)
-        typing_chars = sum(1 for e in events if len(e.key) == 1 and e.action == 'type')
-        average_typing_speed = (typing_chars / total_duration * 60) if total_duration > 0 else 0
-        
-        # Pauses
-        flight_times = [e.flightTime for e in events if e.flightTime > 0]
         pause_threshold = 1000  # 1 second
         long_pause_threshold = 3000  # 3 seconds
-        pause_count = sum(1 for ft in flight_times if ft > pause_threshold)
-        long_pause_count = sum(1 for ft in flight_times if ft > long_pause_threshold)
+        burst_threshold = 100  # < 100ms between keys
+        
+        # Gather all per-event counters in a single pass over the session
+        typing_chars = 0
+        deletion_count = 0
+        paste_count = 0
+        copy_count = 0
+        pause_count = 0
+        long_pause_count = 0
+        burst_events = 0
+        flight_times = []
+        dwell_times = []
+        for e in events:
+            key = e.key
+            action = e.action.lower()
+            if len(key) == 1 and e.action == 'type':
+                typing_chars += 1
+            if 'Backspace' in key or 'Delete' in key:
+                deletion_count += 1
+            if 'paste' in action:
+                paste_count += 1
+            if 'copy' in action:
+                copy_count += 1
+            
+            ft = e.flightTime
+            if ft > 0:
+                flight_times.append(ft)
+                if ft > pause_threshold:
+                    pause_count += 1
+                if ft > long_pause_threshold:
+                    long_pause_count += 1
+                if ft < burst_threshold:
+                    burst_events += 1
+            
+            if e.dwellTime > 0:
+                dwell_times.append(e.dwellTime)
+        
+        # Typing speed (CPM)
+        average_typing_speed = (typing_chars / total_duration * 60) if total_duration > 0 else 0
         
         # Deletions
-        deletion_count = sum(1 for e in events if 'Backspace' in e.key or 'Delete' in e.key)
         deletion_rate = deletion_count / total_keystrokes if total_keystrokes > 0 else 0
         
-        # Copy/Paste
-        paste_count = sum(1 for e in events if hasattr(e, 'action') and 'paste' in e.action.lower())
-        copy_count = sum(1 for e in events if hasattr(e, 'action') and 'copy' in e.action.lower())
-        
         # Timing statistics
-        dwell_times = [e.dwellTime for e in events if e.dwellTime > 0]
         avg_dwell = statistics.mean(dwell_times) if dwell_times else 0
         std_dwell = statistics.stdev(dwell_times) if len(dwell_times) > 1 else 0
         
         avg_flight = statistics.mean(flight_times) if flight_times else 0
         std_flight = statistics.stdev(flight_times) if len(flight_times) > 1 else 0
         
-        # Burst typing (very fast consistent typing)
-        burst_events = sum(1 for ft in flight_times if ft < 100)  # < 100ms between keys
-        
         # Rhythm consistency (inverse of coefficient of variation)
         rhythm_consistency = 1 - (std_flight / avg_flight) if avg_flight > 0 else 0
         rhythm_consistency = max(0, min(1, rhythm_consistency))
@@ -349,13 +372,17 @@ class BehavioralAnalyzer:
         incremental = metrics.paste_count < 3 and metrics.total_duration > 300
         
         # Pivotal moments (large deletions followed by new approach)
+        # Slide a 10-keystroke window, keeping a running deletion count
+        # instead of re-scanning every window
         pivotal_moments = []
+        is_deletion = ['Backspace' in e.key for e in events]
+        deletions = sum(is_deletion[:10])
         for i in range(len(events) - 10):
-            window = events[i:i + 10]
-            deletions = sum(1 for e in window if 'Backspace' in e.key)
+            if i:
+                deletions += is_deletion[i + 9] - is_deletion[i - 1]
             if deletions > 6:  # significant rewrite
                 pivotal_moments.append({
-                    'timestamp': window[0].timestamp / 1000,
+                    'timestamp': events[i].timestamp / 1000,
                     'description': 'Significant code rewrite detected',
                     'deletion_count': deletions
                 })
@@ -520,10 +547,15 @@ Respond ONLY with valid JSON, no additional text."""
             result_text = response.text.strip()
             
             # Extract JSON from markdown code blocks if present
-            if '```json' in result_text:
-                result_text = result_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in result_text:
-                result_text = result_text.split('```')[1].split('```')[0].strip()
+            fence = result_text.find('```json')
+            if fence != -1:
+                start = fence + len('```json')
+            else:
+                fence = result_text.find('```')
+                start = fence + len('```') if fence != -1 else -1
+            if start != -1:
+                end = result_text.find('```', start)
+                result_text = result_text[start:end if end != -1 else None].strip()
             
             analysis = json.loads(result_text)
             
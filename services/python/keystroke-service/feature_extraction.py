@@ -181,42 +181,33 @@ class KeystrokeFeatureExtractor:
                 dummy_event = {'dwellTime': 0, 'flightTime': 0, 'keyCode': 0, 'timestamp': 0}
                 events = [dummy_event] * sequence_length
 
-        sequence = []
-        for i, event in enumerate(events):
-            # HL: Hold Latency (dwell time)
-            hl = float(event.get('dwellTime', 0))
-
-            # IL: Inter-key Latency (flight time)
-            il = float(event.get('flightTime', 0))
-
-            # PL: Press Latency (time between key presses)
-            if i > 0:
-                pl = float(events[i]['timestamp'] - events[i-1]['timestamp'])
-            else:
-                pl = 0.0
-
-            # RL: Release Latency (time between key releases)
-            if i > 0:
-                prev_release = events[i-1]['timestamp'] + events[i-1].get('dwellTime', 0)
-                curr_release = events[i]['timestamp'] + events[i].get('dwellTime', 0)
-                rl = float(curr_release - prev_release)
-            else:
-                rl = 0.0
-
-            # KeyCode: Numeric representation of the key
-            keycode = float(event.get('keyCode', 0))
-
-            # Normalize timing features (convert to seconds for better scale)
-            features = [
-                hl / 1000.0,    # Convert ms to seconds
-                il / 1000.0,
-                pl / 1000.0,
-                rl / 1000.0,
-                keycode / 255.0  # Normalize keycode to 0-1 range
-            ]
-            sequence.append(features)
-
-        return np.array(sequence, dtype=np.float32)
+        # Gather each raw field into its own column, then derive the
+        # latencies with vectorised differences instead of per-event math
+        timestamps = np.array([e['timestamp'] for e in events], dtype=np.float64)
+        dwell = np.array([e.get('dwellTime', 0) for e in events], dtype=np.float64)
+        flight = np.array([e.get('flightTime', 0) for e in events], dtype=np.float64)
+        keycodes = np.array([e.get('keyCode', 0) for e in events], dtype=np.float64)
+
+        # HL: Hold Latency (dwell time)
+        # IL: Inter-key Latency (flight time)
+        # PL: Press Latency (time between key presses, 0 for the first key)
+        pl = np.diff(timestamps, prepend=timestamps[:1])
+
+        # RL: Release Latency (time between key releases, 0 for the first key)
+        releases = timestamps + dwell
+        rl = np.diff(releases, prepend=releases[:1])
+
+        # Normalize timing features (convert to seconds for better scale)
+        # and keycode to the 0-1 range
+        sequence = np.column_stack((
+            dwell / 1000.0,
+            flight / 1000.0,
+            pl / 1000.0,
+            rl / 1000.0,
+            keycodes / 255.0
+        ))
+
+        return sequence.astype(np.float32)
 
     def _categorize_key(self, key: str) -> int:
         """Categorize keys into types (letters, numbers, special, etc.)"""
@@ -12,6 +12,7 @@ import numpy as np
 from datetime import datetime
 import asyncio
 import json
+from collections import deque
 import pika
 
 from feature_extraction import KeystrokeFeatureExtractor
@@ -69,42 +70,86 @@ else:
 # In-memory session storage (use Redis in production)
 active_sessions = {}
 
+# Number of most recent keystroke events buffered per session
+SESSION_BUFFER_SIZE = 500
+
 # RabbitMQ Configuration
 RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'localhost')
 RABBITMQ_EXCHANGE = 'keystroke.exchange'
 RABBITMQ_ROUTING_KEY = 'keystroke.auth.result'
 
-def publish_auth_event(event_data: dict):
-    """Publish authentication event to RabbitMQ"""
-    try:
-        connection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=RABBITMQ_HOST)
-        )
-        channel = connection.channel()
+# Shared RabbitMQ connection, opened lazily and reused across publishes
+_rabbitmq_connection = None
+_rabbitmq_channel = None
 
-        # Declare exchange
-        channel.exchange_declare(
-            exchange=RABBITMQ_EXCHANGE,
-            exchange_type='topic',
-            durable=True
-        )
 
-        # Publish message
-        channel.basic_publish(
-            exchange=RABBITMQ_EXCHANGE,
-            routing_key=RABBITMQ_ROUTING_KEY,
-            body=json.dumps(event_data),
-            properties=pika.BasicProperties(
-                content_type='application/json',
-                delivery_mode=2  # Make message persistent
+def _get_rabbitmq_channel():
+    """Return an open RabbitMQ channel, reconnecting if the previous one dropped"""
+    global _rabbitmq_connection, _rabbitmq_channel
+
+    if _rabbitmq_channel is not None and _rabbitmq_channel.is_open:
+        # Service heartbeats that piled up while the connection sat idle
+        _rabbitmq_connection.process_data_events(time_limit=0)
+        return _rabbitmq_channel
+
+    _close_rabbitmq_connection()
+    _rabbitmq_connection = pika.BlockingConnection(
+        pika.ConnectionParameters(host=RABBITMQ_HOST)
+    )
+    _rabbitmq_channel = _rabbitmq_connection.channel()
+
+    # Declare exchange once per connection
+    _rabbitmq_channel.exchange_declare(
+        exchange=RABBITMQ_EXCHANGE,
+        exchange_type='topic',
+        durable=True
+    )
+    return _rabbitmq_channel
+
+
+def _close_rabbitmq_connection():
+    """Drop the shared RabbitMQ connection so the next publish reconnects"""
+    global _rabbitmq_connection, _rabbitmq_channel
+
+    if _rabbitmq_connection is not None and _rabbitmq_connection.is_open:
+        try:
+            _rabbitmq_connection.close()
+        except Exception:
+            pass
+    _rabbitmq_connection = None
+    _rabbitmq_channel = None
+
+
+def publish_auth_event(event_data: dict):
+    """Publish authentication event to RabbitMQ"""
+    body = json.dumps(event_data)
+
+    # A reused connection may have been closed by the broker since the last
+    # publish, so retry once on a fresh connection before giving up
+    for attempt in range(2):
+        reused = _rabbitmq_channel is not None
+        try:
+            channel = _get_rabbitmq_channel()
+
+            # Publish message
+            channel.basic_publish(
+                exchange=RABBITMQ_EXCHANGE,
+                routing_key=RABBITMQ_ROUTING_KEY,
+                body=body,
+                properties=pika.BasicProperties(
+                    content_type='application/json',
+                    delivery_mode=2  # Make message persistent
+                )
             )
-        )
 
-        connection.close()
-        print(f"✅ Published auth event to RabbitMQ for student: {event_data.get('studentId')}")
-    except Exception as e:
-        print(f"⚠️ Failed to publish to RabbitMQ: {e}")
-        # Don't fail the request if RabbitMQ publish fails
+            print(f"✅ Published auth event to RabbitMQ for student: {event_data.get('studentId')}")
+            return
+        except Exception as e:
+            _close_rabbitmq_connection()
+            if not reused or attempt == 1:
+                print(f"⚠️ Failed to publish to RabbitMQ: {e}")
+                # Don't fail the request if RabbitMQ publish fails
+                return
 
 
 # ==================== Pydantic Models ====================
@@ -206,17 +251,14 @@ async def capture_keystrokes(batch: KeystrokeBatch):
         session_key = f"{user_id}:{session_id}"
         if session_key not in active_sessions:
             active_sessions[session_key] = {
-                'events': [],
+                'events': deque(maxlen=SESSION_BUFFER_SIZE),
                 'last_verification': None,
                 'risk_score': 0.0
             }
 
-        # Add events to session buffer
+        # Add events to session buffer (bounded deque keeps only the most recent)
         active_sessions[session_key]['events'].extend(events)
 
-        # Keep only recent events (last 500)
-        active_sessions[session_key]['events'] = active_sessions[session_key]['events'][-500:]
-
         return {
             "success": True,
             "captured": len(events),
@@ -378,7 +420,7 @@ async def monitor_session(request: MonitoringRequest):
             raise HTTPException(status_code=404, detail="Session not found")
 
         session_data = active_sessions[session_key]
-        events = session_data['events']
+        events = list(session_data['events'])
 
         if len(events) < 150:
             return {
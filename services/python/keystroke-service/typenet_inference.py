@@ -94,6 +94,7 @@ class TypeNetAuthenticator:
             self.load_model(model_path)
 
         self.user_templates = {}  # Store enrolled user templates
+        self._template_matrix = None  # Cached (user_ids, L2-normalised templates) for identification
         print(f"✅ TypeNet initialized on device: {self.device}")
 
     def load_model(self, model_path: str):
@@ -120,7 +121,7 @@ class TypeNetAuthenticator:
         """
         self.model.eval()
 
-        with torch.no_grad():
+        with torch.inference_mode():
             # Convert to tensor and add batch dimension
             x = torch.FloatTensor(keystroke_sequence).unsqueeze(0).to(self.device)
 
@@ -129,6 +130,27 @@ class TypeNetAuthenticator:
 
             return embedding.cpu().numpy()[0]
 
+    def get_embeddings(self, keystroke_sequences: List[np.ndarray]) -> np.ndarray:
+        """
+        Generate embeddings for several keystroke sequences in one forward pass
+
+        Args:
+            keystroke_sequences: List of sequences, each (70, 5)
+
+        Returns:
+            embeddings: (num_sequences, 128) numpy array
+        """
+        self.model.eval()
+
+        with torch.inference_mode():
+            # Stack into a single batch so the model runs once
+            x = torch.from_numpy(np.stack(keystroke_sequences).astype(np.float32)).to(self.device)
+
+            # Get embeddings
+            embeddings = self.model(x)
+
+            return embeddings.cpu().numpy()
+
     def enroll_user(self, user_id: str, keystroke_sequences: List[np.ndarray]) -> Dict:
         """
         Enroll a user by creating a biometric template
@@ -146,22 +168,24 @@ class TypeNetAuthenticator:
                 'message': 'Need at least 3 enrollment samples'
             }
 
-        embeddings = []
+        valid_sequences = []
         for sequence in keystroke_sequences:
             # Validate shape
             if sequence.shape[0] != 70 or sequence.shape[1] != 5:
                 print(f"⚠️ Warning: Sequence has shape {sequence.shape}, expected (70, 5)")
                 continue
 
-            embedding = self.get_embedding(sequence)
-            embeddings.append(embedding)
+            valid_sequences.append(sequence)
 
-        if len(embeddings) < 3:
+        if len(valid_sequences) < 3:
             return {
                 'success': False,
                 'message': 'Not enough valid sequences for enrollment'
             }
 
+        # Embed all enrollment samples in a single batch
+        embeddings = self.get_embeddings(valid_sequences)
+
         # Create template as mean of embeddings
         template = np.mean(embeddings, axis=0)
         template_std = np.std(embeddings, axis=0)
@@ -171,6 +195,7 @@ class TypeNetAuthenticator:
             'std': template_std,
             'sample_count': len(embeddings)
         }
+        self._template_matrix = None
 
         return {
             'success': True,
@@ -226,6 +251,60 @@ class TypeNetAuthenticator:
             'message': 'Authenticated' if authenticated else 'Authentication failed'
         }
 
+    def continuous_authentication(self, user_id: str, keystroke_sequences: List[np.ndarray],
+                                  threshold: float = 0.7) -> Dict:
+        """
+        Verify several recent keystroke sequences of an active session at once
+
+        Args:
+            user_id: User to verify
+            keystroke_sequences: List of recent sequences, each (70, 5)
+            threshold: Similarity threshold (0-1) applied to the average similarity
+
+        Returns:
+            monitoring_result: Dict with session status and average risk score
+        """
+        if user_id not in self.user_templates:
+            return {
+                'success': False,
+                'status': 'NOT_ENROLLED',
+                'message': 'User not enrolled',
+                'average_risk_score': 1.0
+            }
+
+        valid_sequences = [s for s in keystroke_sequences if s.shape == (70, 5)]
+        if not valid_sequences:
+            return {
+                'success': False,
+                'status': 'INVALID_INPUT',
+                'message': 'No valid sequences, expected shape (70, 5)',
+                'average_risk_score': 0.0
+            }
+
+        # Embed every sequence in one batch and score them against the template together
+        embeddings = self.get_embeddings(valid_sequences)
+        template = self.user_templates[user_id]['template']
+        norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(template)
+        dots = embeddings @ template
+        similarities = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+
+        average_similarity = float(similarities.mean())
+        average_risk_score = 1 - average_similarity
+        authenticated = average_similarity >= threshold
+
+        return {
+            'success': True,
+            'user_id': user_id,
+            'status': 'AUTHENTICATED' if authenticated else 'SUSPICIOUS',
+            'authenticated': authenticated,
+            'average_similarity': average_similarity,
+            'average_risk_score': average_risk_score,
+            'risk_scores': [float(1 - sim) for sim in similarities],
+            'verification_count': len(valid_sequences),
+            'threshold': threshold,
+            'message': 'Session authenticated' if authenticated else 'Typing pattern deviates from enrolled user'
+        }
+
     def identify_user(self, keystroke_sequence: np.ndarray, top_k: int = 3) -> Dict:
         """
         Identify user by comparing against all enrolled users
@@ -254,21 +333,20 @@ class TypeNetAuthenticator:
         # Get embedding
         current_embedding = self.get_embedding(keystroke_sequence)
 
-        # Compare against all users
-        similarities = []
-        for user_id, user_data in self.user_templates.items():
-            template = user_data['template']
-            similarity = self._cosine_similarity(current_embedding, template)
-
-            similarities.append({
-                'userId': user_id,
-                'similarity': float(similarity),
-                'confidence': float(similarity * 100)
-            })
-
-        # Sort by similarity
-        similarities.sort(key=lambda x: x['similarity'], reverse=True)
-        top_matches = similarities[:top_k]
+        # Cosine similarity against all users is an inner product of unit vectors
+        user_ids, templates = self._get_template_matrix()
+        similarities = templates @ self._l2_normalize(current_embedding)
+
+        # Sort by similarity (stable, so ties keep enrollment order)
+        order = np.argsort(-similarities, kind='stable')[:top_k]
+        top_matches = [
+            {
+                'userId': user_ids[idx],
+                'similarity': float(similarities[idx]),
+                'confidence': float(similarities[idx] * 100)
+            }
+            for idx in order
+        ]
 
         # Add rank
         for i, match in enumerate(top_matches):
@@ -297,6 +375,20 @@ class TypeNetAuthenticator:
             'message': f'Identified with {confidence_level} confidence'
         }
 
+    def _get_template_matrix(self):
+        """Return enrolled user ids and their L2-normalised templates, rebuilt after changes"""
+        if self._template_matrix is None:
+            user_ids = list(self.user_templates.keys())
+            templates = np.stack([user_data['template'] for user_data in self.user_templates.values()])
+            self._template_matrix = (user_ids, self._l2_normalize(templates))
+        return self._template_matrix
+
+    @staticmethod
+    def _l2_normalize(x: np.ndarray) -> np.ndarray:
+        """Scale vectors (along the last axis) to unit length, leaving zero vectors at zero"""
+        norms = np.linalg.norm(x, axis=-1, keepdims=True)
+        return np.divide(x, norms, out=np.zeros_like(x), where=norms != 0)
+
     def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors"""
         dot_product = np.dot(a, b)
@@ -318,6 +410,7 @@ class TypeNetAuthenticator:
         """Load user templates from disk"""
         with open(templates_path, 'rb') as f:
             self.user_templates = pickle.load(f)
+        self._template_matrix = None
         print(f"✅ Loaded {len(self.user_templates)} user templates")
 
 